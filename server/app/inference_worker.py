@@ -0,0 +1,276 @@
+"""Standalone inference worker shared by every web worker process.
+
+Run one instance per GPU host::
+
+    cd server
+    AI_INFERENCE_ADDR=127.0.0.1:8790 AI_INFERENCE_AUTHKEY=<secret> python -m app.inference_worker
+
+and start the web workers with the same ``AI_INFERENCE_ADDR`` and ``AI_INFERENCE_AUTHKEY``;
+``get_model()`` then returns an ``InferenceClient`` instead of loading YOLO weights in every process.
+Frames travel through ``multiprocessing.shared_memory`` so only a small control message crosses the
+socket, and requests from all connected web workers are batched into shared ``predict`` calls.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+import logging
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.shared_memory import SharedMemory
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+MAX_WAIT_MS = 10
+
+
+def parse_address(value: str) -> Tuple[str, int]:
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+def inference_authkey() -> bytes:
+    # multiprocessing.connection unpickles every message, so the key is what stands between a
+    # reachable worker port and code execution in the worker; there is deliberately no default.
+    key = os.getenv("AI_INFERENCE_AUTHKEY", "")
+    if not key:
+        raise RuntimeError("AI_INFERENCE_AUTHKEY must be set to a shared secret when using AI_INFERENCE_ADDR")
+    return key.encode("utf-8")
+
+
+def _attach_shared_memory(name: str) -> SharedMemory:
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 always registers attached segments; the client owns and unlinks them.
+        shm = SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+        return shm
+
+
+class InferenceClient:
+    """Model stand-in returned by ``get_model()`` when a shared inference worker is configured."""
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes) -> None:
+        self._address = address
+        self._authkey = authkey
+        self._lock = threading.Lock()
+        self._idle: List[Connection] = []
+        self._names: Optional[Dict[int, str]] = None
+
+    @property
+    def names(self) -> Dict[int, str]:
+        if self._names is None:
+            self._names = self._call(("names",))
+        return self._names
+
+    def predict_boxes(self, frames: List[np.ndarray], conf: float) -> List[List[Dict[str, Any]]]:
+        frames = [np.ascontiguousarray(frame) for frame in frames]
+        layout: List[Tuple[int, Tuple[int, ...], str]] = []
+        offset = 0
+        for frame in frames:
+            layout.append((offset, frame.shape, frame.dtype.str))
+            offset += frame.nbytes
+
+        shm = SharedMemory(create=True, size=max(offset, 1))
+        try:
+            for frame, (start, _, _) in zip(frames, layout):
+                shm.buf[start : start + frame.nbytes] = frame.reshape(-1).view(np.uint8)
+            return self._call(("predict", shm.name, layout, conf))
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def _call(self, message: Tuple[Any, ...]) -> Any:
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = Client(self._address, authkey=self._authkey)
+
+        try:
+            conn.send(message)
+            status, payload = conn.recv()
+        except Exception:
+            conn.close()
+            raise
+
+        with self._lock:
+            self._idle.append(conn)
+        if status != "ok":
+            raise RuntimeError(f"Inference worker error: {payload}")
+        return payload
+
+
+@dataclass
+class _PendingRequest:
+    frames: List[np.ndarray]
+    conf: float
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: Optional[str] = None
+
+
+class InferenceServer:
+    """Hosts one model and batches predict requests arriving from any number of clients."""
+
+    def __init__(
+        self, model: Any, listener: Listener, max_batch: Optional[int] = None, max_wait_ms: float = MAX_WAIT_MS
+    ) -> None:
+        if max_batch is None:
+            # TensorRT engines are exported with this as their dynamic batch limit.
+            from app.main import VIDEO_BATCH_SIZE
+
+            max_batch = VIDEO_BATCH_SIZE
+        self._model = model
+        self._listener = listener
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000
+        self._requests: queue.Queue[Optional[_PendingRequest]] = queue.Queue()
+        self._closed = threading.Event()
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._listener.address
+
+    def serve_forever(self) -> None:
+        threading.Thread(target=self._accept_loop, name="inference-accept", daemon=True).start()
+        carry: Optional[_PendingRequest] = None
+        while True:
+            first = carry if carry is not None else self._requests.get()
+            carry = None
+            if first is None:
+                return
+            batch = [first]
+            frame_count = len(first.frames)
+            deadline = time.monotonic() + self._max_wait
+            while frame_count < self._max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._requests.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._requests.put(None)
+                    break
+                if frame_count + len(request.frames) > self._max_batch:
+                    # Would overflow the model's batch limit; it opens the next batch instead.
+                    carry = request
+                    break
+                batch.append(request)
+                frame_count += len(request.frames)
+            self._run_batch(batch)
+
+    def close(self) -> None:
+        self._closed.set()
+        self._listener.close()
+        self._requests.put(None)
+
+    def _run_batch(self, batch: List[_PendingRequest]) -> None:
+        from app.main import _predict_boxes
+
+        by_conf: Dict[float, List[_PendingRequest]] = {}
+        for request in batch:
+            by_conf.setdefault(request.conf, []).append(request)
+
+        for conf, requests in by_conf.items():
+            frames = [frame for request in requests for frame in request.frames]
+            try:
+                # A single request may itself exceed the limit, so split as well.
+                boxes = []
+                for start in range(0, len(frames), self._max_batch):
+                    boxes.extend(_predict_boxes(self._model, frames[start : start + self._max_batch], conf))
+            except Exception as exc:
+                logger.exception("Batched inference failed")
+                for request in requests:
+                    request.error = str(exc)
+                    request.done.set()
+                continue
+
+            start = 0
+            for request in requests:
+                request.result = boxes[start : start + len(request.frames)]
+                start += len(request.frames)
+                request.done.set()
+
+    def _accept_loop(self) -> None:
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                if self._closed.is_set():
+                    return
+                logger.warning("Rejected inference client", exc_info=True)
+                continue
+            threading.Thread(target=self._handle, args=(conn,), name="inference-client", daemon=True).start()
+
+    def _handle(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+
+                if message[0] == "names":
+                    conn.send(("ok", dict(self._model.names)))
+                    continue
+
+                try:
+                    reply = self._predict(*message[1:])
+                except Exception as exc:
+                    logger.warning("Could not serve inference request", exc_info=True)
+                    reply = ("error", str(exc))
+                conn.send(reply)
+
+    def _predict(
+        self, shm_name: str, layout: List[Tuple[int, Tuple[int, ...], str]], conf: float
+    ) -> Tuple[str, Any]:
+        shm = _attach_shared_memory(shm_name)
+        try:
+            # Copy the frames out: the model (e.g. Ultralytics' predictor.batch) may keep references to
+            # its inputs after predict returns, and touching a view once the segment is unmapped crashes.
+            frames = [
+                np.array(np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset))
+                for offset, shape, dtype in layout
+            ]
+        finally:
+            shm.close()
+
+        request = _PendingRequest(frames=frames, conf=float(conf))
+        self._requests.put(request)
+        request.done.wait()
+
+        if request.error is not None:
+            return "error", request.error
+        return "ok", request.result
+
+
+def main() -> None:
+    from app.main import _load_model
+
+    logging.basicConfig(level=logging.INFO)
+    address = parse_address(os.getenv("AI_INFERENCE_ADDR", "127.0.0.1:8790"))
+    authkey = inference_authkey()
+    model = _load_model()
+    server = InferenceServer(model, Listener(address, authkey=authkey))
+    logger.info("Inference worker listening on %s:%s", *server.address)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,30 +1,65 @@
 from __future__ import annotations
 
+import asyncio
+import atexit
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import functools
 import io
-import json
 import logging
 import os
 from pathlib import Path
+import queue
+import shutil
+import signal
 import socket
 import tempfile
+import threading
 import time
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, BinaryIO, Callable, Deque, Dict, List, Optional, Tuple, Union
 
 from fastapi import FastAPI, File, Query, Request, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import numpy as np
-from PIL import Image
+import orjson
 import torch
 
+from app.inference_worker import InferenceClient, inference_authkey, parse_address
+
 
 # Lazy model creation so tests can monkeypatch it without downloading weights.
 _model: Optional[Any] = None
+# Extra model.predict keyword arguments chosen when the local model is loaded (device, half precision).
+_predict_options: Dict[str, Any] = {}
+# Inference runs on executor threads: one lock guards the lazy load, another serialises predict calls.
+_model_lock = threading.Lock()
+_predict_lock = threading.Lock()
 logger = logging.getLogger(__name__)
 LOGS_DIR = Path(__file__).resolve().parents[2] / "logs"
 ANALYTICS_LOG_FILE = LOGS_DIR / "detection_analytics.jsonl"
+ANALYTICS_FLUSH_INTERVAL_SEC = 0.5
+ANALYTICS_FLUSH_BYTES = 64 * 1024
+ANALYTICS_FLUSH_ENTRIES = 64
 SIGNALING_RELAY_FILE = Path(__file__).resolve().parents[1] / "server.py"
+MODEL_WEIGHTS = Path("yolov8x.pt")
+# Square network input size the model was trained/exported for.
+MODEL_INPUT_SIZE = 640
+# Sampled frames per predict call; raise until GPU utilisation saturates (also the TensorRT max batch).
+VIDEO_BATCH_SIZE = max(1, int(os.getenv("AI_VIDEO_BATCH_SIZE", "16")))
+# OpenCV seeks restart decoding at the preceding keyframe, so seeking straight to
+# sampled frames only beats sequential decode once the stride spans a typical GOP.
+VIDEO_SEEK_MIN_STRIDE = 150
+# Uploaded videos are copied to disk in chunks of this size.
+UPLOAD_CHUNK_BYTES = 1 << 20
+# Host IPs rarely change while the server runs; rediscover them at most this often.
+LAN_IP_CACHE_TTL_SEC = 60.0
+# Concurrent /detect calls are coalesced into one predict call of up to this many images.
+INFERENCE_MAX_BATCH = 8
+INFERENCE_MAX_WAIT_MS = 10
+# Inference jobs (image batches, video requests) allowed off the event loop at once; size to GPU memory.
+INFER_CONCURRENCY = max(1, int(os.getenv("INFER_CONCURRENCY", "2")))
 
 SIGNALING_RELAY_SOURCE = """import asyncio
 import websockets
@@ -36,19 +71,19 @@ async def relay(websocket):
     clients.add(websocket)
     try:
         async for message in websocket:
-            for client in tuple(clients):
-                if client is websocket:
-                    continue
-                try:
-                    await client.send(message)
-                except Exception:
-                    pass
+            # Send to every peer concurrently so one slow peer does not hold up the others.
+            await asyncio.gather(
+                *(client.send(message) for client in tuple(clients) if client is not websocket),
+                return_exceptions=True,
+            )
     finally:
         clients.discard(websocket)
 
 
 async def main():
-    async with websockets.serve(relay, "0.0.0.0", 8765):
+    async with websockets.serve(
+        relay, "0.0.0.0", 8765, compression=None, max_size=65536, max_queue=32, write_limit=65536
+    ):
         print("WebSocket relay listening on ws://0.0.0.0:8765")
         await asyncio.Future()
 
@@ -58,36 +93,288 @@ if __name__ == "__main__":
 """
 
 
+_iso_second_cache: Tuple[int, str] = (-1, "")
+
+
+def _iso_from_ns(ns: int) -> str:
+    global _iso_second_cache
+    seconds, remainder = divmod(ns, 1_000_000_000)
+    # Request/completion stamps mostly fall in the same second; only format the date part once per second.
+    cached_seconds, prefix = _iso_second_cache
+    if cached_seconds != seconds:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _iso_second_cache = (seconds, prefix)
+    return f"{prefix}.{remainder // 1_000_000:03d}Z"
+
+
+def _duration_ms(start_ns: int, end_ns: int, parts: int = 1) -> int:
+    return int(round((end_ns - start_ns) / 1_000_000 / parts))
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson; numpy arrays and scalars serialize natively."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+class _AnalyticsLogWriter:
+    """Appends encoded JSONL lines from a background thread through one long-lived buffered handle."""
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._queue: queue.SimpleQueue[Optional[bytes]] = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def write(self, line: bytes) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="analytics-log-writer", daemon=True)
+                self._thread.start()
+        self._queue.put(line)
+
+    def close(self, timeout: float = 2.0) -> None:
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+
+    def _run(self) -> None:
+        handle = None
+        buffered = 0
+        entries = 0
+        flush_deadline = 0.0
+        try:
+            while True:
+                if buffered:
+                    try:
+                        line = self._queue.get(timeout=max(0.0, flush_deadline - time.monotonic()))
+                    except queue.Empty:
+                        line = b""
+                else:
+                    line = self._queue.get()
+
+                if line:
+                    try:
+                        if handle is None:
+                            self._path.parent.mkdir(parents=True, exist_ok=True)
+                            handle = self._path.open("ab", buffering=ANALYTICS_FLUSH_BYTES)
+                        handle.write(line)
+                        if not buffered:
+                            flush_deadline = time.monotonic() + ANALYTICS_FLUSH_INTERVAL_SEC
+                        buffered += len(line)
+                        entries += 1
+                    except Exception:
+                        logger.warning("Could not append analytics log", exc_info=True)
+
+                if handle is not None and buffered and (
+                    line is None
+                    or buffered >= ANALYTICS_FLUSH_BYTES
+                    or entries >= ANALYTICS_FLUSH_ENTRIES
+                    or time.monotonic() >= flush_deadline
+                ):
+                    try:
+                        handle.flush()
+                    except Exception:
+                        logger.warning("Could not flush analytics log", exc_info=True)
+                    buffered = 0
+                    entries = 0
+
+                if line is None:
+                    return
+        finally:
+            if handle is not None:
+                try:
+                    handle.close()
+                except Exception:
+                    logger.warning("Could not close analytics log", exc_info=True)
+
 
-def _now_iso() -> str:
-    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime()) + f".{int((time.time() % 1) * 1000):03d}Z"
+_analytics_writer = _AnalyticsLogWriter(ANALYTICS_LOG_FILE)
+# The shutdown hook covers normal server stops; this also flushes scripts and workers that never run it.
+atexit.register(_analytics_writer.close)
+DECODE_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="image-decode")
 
 
 def _append_analysis_log(entry: Dict[str, Any]) -> None:
     try:
-        LOGS_DIR.mkdir(parents=True, exist_ok=True)
-        with ANALYTICS_LOG_FILE.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        # orjson emits UTF-8 bytes; the writer appends them as-is, with no str round trip.
+        _analytics_writer.write(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE))
     except Exception:
         logger.warning("Could not append analytics log", exc_info=True)
 
 
+def _export_tensorrt_engine(weights: Path) -> Path:
+    from ultralytics import YOLO
+
+    int8 = os.getenv("AI_TRT_PRECISION", "fp16").lower() == "int8"
+    # The engine's dynamic batch limit is fixed at export, so the batch size is part of the cached file name.
+    engine_path = weights.with_name(f"{weights.stem}{'-int8' if int8 else ''}-b{VIDEO_BATCH_SIZE}.engine")
+    if not engine_path.exists():
+        options: Dict[str, Any] = {"half": True}
+        if int8:
+            # INT8 needs a representative calibration set; Ultralytics takes a dataset yaml.
+            options = {"int8": True, "data": os.getenv("AI_TRT_CALIB_DATA", "coco128.yaml")}
+        logger.info("Exporting %s to TensorRT %s engine (one-time)", weights, "INT8" if int8 else "FP16")
+        # Ultralytics always writes `<weights>.engine` (and its ONNX intermediate) next to the weights it
+        # exports from; exporting a copy named after the target keeps FP16 and INT8 builds apart.
+        checkpoint = YOLO(str(weights)).ckpt_path  # downloads the weights on first use
+        with tempfile.TemporaryDirectory() as staging_dir:
+            staged = Path(staging_dir) / f"{engine_path.stem}.pt"
+            shutil.copyfile(checkpoint, staged)
+            exported = YOLO(str(staged)).export(
+                format="engine",
+                imgsz=MODEL_INPUT_SIZE,
+                dynamic=True,
+                batch=VIDEO_BATCH_SIZE,
+                device=0,
+                workspace=4,
+                **options,
+            )
+            shutil.move(str(exported), engine_path)
+    return engine_path
+
+
+def _load_model() -> Any:
+    from ultralytics import YOLO
+
+    # Biggest common pretrained model in YOLOv8 family.
+    weights = MODEL_WEIGHTS
+    model = None
+    if os.getenv("AI_EXPORT_TRT") == "1":
+        try:
+            model = YOLO(str(_export_tensorrt_engine(weights)), task="detect")
+        except Exception:
+            logger.warning("TensorRT export failed; falling back to %s", weights, exc_info=True)
+    if model is None:
+        model = YOLO(str(weights))
+
+    _predict_options.clear()
+    if torch.cuda.is_available():
+        # Input shape is fixed, so let cuDNN pick the fastest conv algorithms once; allow TF32 on Ampere+.
+        torch.backends.cudnn.benchmark = True
+        torch.backends.cudnn.allow_tf32 = True
+        torch.backends.cuda.matmul.allow_tf32 = True
+        torch.set_float32_matmul_precision("high")
+        # Ultralytics moves, fuses and (with half=True) casts the network to FP16 on the first predict.
+        _predict_options["device"] = 0
+        if os.getenv("AI_PRECISION", "fp16").lower() == "fp16":
+            _predict_options["half"] = True
+
+    # Pay model fusion and cuDNN autotuning here instead of on the first request.
+    with torch.inference_mode():
+        model.predict(
+            np.zeros((MODEL_INPUT_SIZE, MODEL_INPUT_SIZE, 3), dtype=np.uint8), verbose=False, **_predict_options
+        )
+    return model
+
+
 def get_model():
     global _model
     if _model is None:
-        from ultralytics import YOLO
-
-        # Biggest common pretrained model in YOLOv8 family.
-        _model = YOLO("yolov8x.pt")
+        with _model_lock:
+            if _model is None:
+                inference_addr = os.getenv("AI_INFERENCE_ADDR")
+                if inference_addr:
+                    # One shared worker process owns the GPU model; see app/inference_worker.py.
+                    _model = InferenceClient(parse_address(inference_addr), inference_authkey())
+                else:
+                    _model = _load_model()
     return _model
 
 
+def _preload_model() -> None:
+    try:
+        get_model()
+    except Exception:
+        logger.warning("Model preload failed; it will be retried on the first request", exc_info=True)
+
+
+def _predict_batch(images: List[np.ndarray], conf: float) -> List[List[Dict[str, Any]]]:
+    return _predict_boxes(get_model(), images, conf)
+
+
+class _InferenceBatcher:
+    """Single consumer that turns concurrent predict requests into batched model calls."""
+
+    def __init__(
+        self,
+        max_batch: int = INFERENCE_MAX_BATCH,
+        max_wait_ms: float = INFERENCE_MAX_WAIT_MS,
+        slots: Optional[asyncio.Semaphore] = None,
+    ) -> None:
+        self._max_batch = max_batch
+        self._max_wait = max_wait_ms / 1000
+        self._slots = slots or asyncio.Semaphore(INFER_CONCURRENCY)
+        self._pending: Deque[Tuple[np.ndarray, float, asyncio.Future]] = deque()
+        self._worker: Optional[asyncio.Task] = None
+
+    async def predict(self, img: np.ndarray, conf: float) -> List[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((img, conf, future))
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._drain())
+        return await future
+
+    async def _drain(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._pending:
+            if len(self._pending) < self._max_batch:
+                # Give requests arriving right behind this one a chance to share the batch.
+                await asyncio.sleep(self._max_wait)
+
+            batch = [self._pending.popleft() for _ in range(min(self._max_batch, len(self._pending)))]
+            by_conf: Dict[float, List[Tuple[np.ndarray, float, asyncio.Future]]] = {}
+            for item in batch:
+                by_conf.setdefault(item[1], []).append(item)
+
+            for conf, items in by_conf.items():
+                try:
+                    async with self._slots:
+                        results = await loop.run_in_executor(
+                            None, _predict_batch, [img for img, _, _ in items], conf
+                        )
+                except Exception as exc:
+                    for _, _, future in items:
+                        if not future.done():
+                            future.set_exception(exc)
+                    continue
+
+                for (_, _, future), result in zip(items, results):
+                    if not future.done():
+                        future.set_result(result)
+
+
 def _network_urls_for_ips(ips: List[str], port: int) -> List[str]:
     cleaned = sorted({ip for ip in ips if ip and not ip.startswith("127.") and not ip.startswith("169.254.")})
     return [f"http://{ip}:{port}" for ip in cleaned]
 
 
+def _interface_ipv4_addresses() -> Optional[List[str]]:
+    """IPv4 addresses read from the kernel interface table, or ``None`` when netifaces is not installed."""
+    try:
+        import netifaces
+    except ImportError:
+        return None
+
+    ips: List[str] = []
+    try:
+        for iface in netifaces.interfaces():
+            ips.extend(entry["addr"] for entry in netifaces.ifaddresses(iface).get(netifaces.AF_INET, ()))
+    except (OSError, ValueError, KeyError):
+        return None
+    return ips
+
+
 def _discover_local_ips() -> List[str]:
+    # Enumerating interfaces needs no DNS lookup or routable network, so it cannot stall offline.
+    interface_ips = _interface_ipv4_addresses()
+    if interface_ips:
+        return sorted(set(interface_ips))
+
     ips: set[str] = set()
 
     try:
@@ -128,6 +415,29 @@ def _lan_ip_candidates() -> List[str]:
     return preferred + rest
 
 
+class _TimedCache:
+    """Memoizes a zero-argument loader for ``ttl`` seconds."""
+
+    def __init__(self, loader: Callable[[], Any], ttl: float) -> None:
+        self._loader = loader
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._value: Any = None
+        self._expires_at = 0.0
+
+    def get(self) -> Any:
+        with self._lock:
+            now = time.monotonic()
+            if now >= self._expires_at:
+                self._value = self._loader()
+                self._expires_at = now + self._ttl
+            return self._value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expires_at = 0.0
+
+
 def _ensure_signaling_relay_script() -> Path:
     SIGNALING_RELAY_FILE.parent.mkdir(parents=True, exist_ok=True)
     if not SIGNALING_RELAY_FILE.exists():
@@ -135,7 +445,9 @@ def _ensure_signaling_relay_script() -> Path:
     return SIGNALING_RELAY_FILE
 
 
+@functools.lru_cache(maxsize=16)
 def _phone_publisher_html(ip: str, signaling_port: int = 8765) -> str:
+    # Pure function of its arguments, so each (ip, port) page is rendered once; the bound caps ?ip= abuse.
     ws_url = f"ws://{ip}:{signaling_port}"
     return f"""<!doctype html>
 <html>
@@ -212,7 +524,7 @@ def _phone_publisher_html(ip: str, signaling_port: int = 8765) -> str:
         const offer = await pc.createOffer();
         await pc.setLocalDescription(offer);
         send({{ type: 'offer', sdp: offer.sdp }});
-        log(`Offer sent (${facingMode})`);
+        log(`Offer sent (${{facingMode}})`);
       }}
 
       function connectSocket() {{
@@ -285,40 +597,242 @@ def _box_xyxy_list(xyxy: Any) -> List[float]:
     return [float(v) for v in xyxy_arr.tolist()]
 
 
-def _results_to_boxes(result: Any, model_names: Dict[int, str]) -> List[Dict[str, Any]]:
+_names_cache: Tuple[Any, Tuple[str, ...]] = (None, ())
+
+
+def _packed_box_lists(
+    xyxy: torch.Tensor, conf: Optional[torch.Tensor], cls: Optional[torch.Tensor]
+) -> Tuple[List[List[float]], Optional[List[float]], Optional[List[int]]]:
+    # Pack every column into one tensor so a CUDA result costs a single device-to-host copy,
+    # then let torch build the Python lists directly without a numpy detour.
+    columns = [xyxy.reshape(-1, 4)]
+    if conf is not None:
+        columns.append(conf.reshape(-1, 1).to(xyxy.dtype))
+    if cls is not None:
+        columns.append(cls.reshape(-1, 1).to(xyxy.dtype))
+    packed = torch.cat(columns, dim=1).detach().cpu()
+
+    xyxy_lists = packed[:, :4].tolist()
+    scores = packed[:, 4].tolist() if conf is not None else None
+    cls_ids = packed[:, -1].to(torch.int64).tolist() if cls is not None else None
+    return xyxy_lists, scores, cls_ids
+
+
+def _names_tuple(model_names: Dict[int, str]) -> Tuple[str, ...]:
+    return tuple(model_names.get(idx, str(idx)) for idx in range(max(model_names, default=-1) + 1))
+
+
+def _class_names(model: Any) -> Tuple[str, ...]:
+    # Ultralytics' Model.names builds a fresh dict on every access, so cache per model object and
+    # only read it again when get_model() hands out a different model.
+    global _names_cache
+    source, names = _names_cache
+    if source is not model:
+        names = _names_tuple(model.names)
+        _names_cache = (model, names)
+    return names
+
+
+def _results_to_boxes(
+    result: Any, model_names: Union[Dict[int, str], Tuple[str, ...]]
+) -> List[Dict[str, Any]]:
     boxes = getattr(result, "boxes", None)
     if boxes is None:
         return []
 
+    names = _names_tuple(model_names) if isinstance(model_names, dict) else model_names
+    name_count = len(names)
+    output: List[Dict[str, Any]] = []
+    append = output.append
+
     if hasattr(boxes, "xyxy"):
-        xyxy_arr = _to_numpy(boxes.xyxy)
-        conf_arr = (
-            _to_numpy(boxes.conf, dtype=float) if getattr(boxes, "conf", None) is not None else None
-        )
-        cls_arr = _to_numpy(boxes.cls, dtype=int) if getattr(boxes, "cls", None) is not None else None
-
-        output: List[Dict[str, Any]] = []
-        for idx in range(len(xyxy_arr)):
-            cls_id = int(cls_arr[idx]) if cls_arr is not None else -1
-            name = model_names.get(cls_id, str(cls_id))
-            score = float(conf_arr[idx]) if conf_arr is not None else 0.0
-            xyxy_list = [float(v) for v in xyxy_arr[idx].tolist()]
-            output.append({"name": name, "score": score, "xyxy": xyxy_list})
-        return output
-
-    output = []
+        xyxy = boxes.xyxy
+        conf = getattr(boxes, "conf", None)
+        cls = getattr(boxes, "cls", None)
+        # Materialise each column with one C-level tolist() instead of casting element by element.
+        # Ultralytics Boxes slice all columns from one data array, so the xyxy type decides for all three.
+        if isinstance(xyxy, torch.Tensor):
+            xyxy_lists, scores, cls_ids = _packed_box_lists(xyxy, conf, cls)
+        else:
+            xyxy_lists = np.asarray(xyxy, dtype=np.float64).tolist()
+            scores = np.asarray(conf, dtype=np.float64).tolist() if conf is not None else None
+            cls_ids = np.asarray(cls, dtype=np.int64).tolist() if cls is not None else None
+
+        count = len(xyxy_lists)
+        if scores is None:
+            scores = [0.0] * count
+        if cls_ids is None:
+            cls_ids = [-1] * count
+        return [
+            {"name": names[cls_id] if 0 <= cls_id < name_count else str(cls_id), "score": score, "xyxy": xyxy}
+            for cls_id, score, xyxy in zip(cls_ids, scores, xyxy_lists)
+        ]
+
     for box in boxes:
         cls_arr = _to_numpy(box.cls, dtype=int)
         conf_arr = _to_numpy(box.conf, dtype=float)
         xyxy_arr = _to_numpy(box.xyxy)
         cls_id = int(np.ravel(cls_arr)[0])
-        name = model_names.get(cls_id, str(cls_id))
+        name = names[cls_id] if 0 <= cls_id < name_count else str(cls_id)
         score = float(np.ravel(conf_arr)[0])
         xyxy_list = _box_xyxy_list(xyxy_arr)
-        output.append({"name": name, "score": score, "xyxy": xyxy_list})
+        append({"name": name, "score": score, "xyxy": xyxy_list})
     return output
 
 
+def _letterbox_shape(height: int, width: int, size: int = MODEL_INPUT_SIZE, stride: int = 32) -> Tuple[int, int]:
+    """Smallest stride-aligned ``(height, width)`` holding the frame scaled to ``size``, as Ultralytics pads it."""
+    scale = min(size / height, size / width)
+    new_h, new_w = int(round(height * scale)), int(round(width * scale))
+    return -(-new_h // stride) * stride, -(-new_w // stride) * stride
+
+
+def _letterbox_into(frame: np.ndarray, dst: np.ndarray) -> Tuple[float, int, int]:
+    """Resize ``frame`` into ``dst`` keeping aspect ratio; returns ``(scale, pad_x, pad_y)``."""
+    import cv2
+
+    dst_h, dst_w = dst.shape[:2]
+    height, width = frame.shape[:2]
+    scale = min(dst_h / height, dst_w / width)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    pad_x, pad_y = (dst_w - new_w) // 2, (dst_h - new_h) // 2
+
+    dst[...] = 114
+    if (new_w, new_h) != (width, height):
+        frame = cv2.resize(frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    dst[pad_y : pad_y + new_h, pad_x : pad_x + new_w] = frame
+    return scale, pad_x, pad_y
+
+
+def _unletterbox_boxes(
+    boxes: List[Dict[str, Any]], scale: float, pad_x: int, pad_y: int, width: int, height: int
+) -> List[Dict[str, Any]]:
+    for box in boxes:
+        x1, y1, x2, y2 = box["xyxy"]
+        box["xyxy"] = [
+            min(max((x1 - pad_x) / scale, 0.0), float(width)),
+            min(max((y1 - pad_y) / scale, 0.0), float(height)),
+            min(max((x2 - pad_x) / scale, 0.0), float(width)),
+            min(max((y2 - pad_y) / scale, 0.0), float(height)),
+        ]
+    return boxes
+
+
+class _PinnedFrameBuffer:
+    """Reusable page-locked uint8 NHWC staging buffer for letterboxed frames."""
+
+    def __init__(self, size: int = MODEL_INPUT_SIZE) -> None:
+        self.size = size
+        self.lock = threading.Lock()
+        self._buffer: Optional[torch.Tensor] = None
+
+    def take(self, count: int) -> torch.Tensor:
+        if self._buffer is None or self._buffer.shape[0] < count:
+            self._buffer = torch.empty((count, self.size, self.size, 3), dtype=torch.uint8, pin_memory=True)
+        return self._buffer[:count]
+
+
+_pinned_frames = _PinnedFrameBuffer()
+_h2d_stream: Optional[torch.cuda.Stream] = None
+
+
+def _copy_stream() -> torch.cuda.Stream:
+    global _h2d_stream
+    if _h2d_stream is None:
+        _h2d_stream = torch.cuda.Stream()
+    return _h2d_stream
+
+
+def _preprocess_batch(frames: List[np.ndarray]) -> Tuple[torch.Tensor, List[Tuple[float, int, int]]]:
+    with _pinned_frames.lock:
+        host = _pinned_frames.take(len(frames))
+        host_np = host.numpy()
+        letterbox = [_letterbox_into(frame, host_np[idx]) for idx, frame in enumerate(frames)]
+
+        # Ship uint8 (a quarter of the fp32 bytes) and normalize on the GPU: BGR NHWC -> RGB NCHW in [0, 1].
+        # A side stream lets this copy run while the default stream is still busy with the previous batch.
+        stream = _copy_stream()
+        with torch.cuda.stream(stream):
+            device_batch = host.to("cuda", non_blocking=True)
+            tensor = device_batch.permute(0, 3, 1, 2).flip(1).half().div_(255).contiguous()
+            ready = torch.cuda.Event()
+            ready.record(stream)
+        # The staging buffer may only be refilled once the async copy has landed.
+        ready.synchronize()
+    return tensor, letterbox
+
+
+class _HostFrameBuffers:
+    """Double-buffered uint8 NHWC batches for CPU inference: one fills while the other is being predicted."""
+
+    def __init__(self, count: int = 2) -> None:
+        self._buffers: List[Optional[np.ndarray]] = [None] * count
+        self._next = 0
+
+    def take(self, count: int, height: int, width: int) -> np.ndarray:
+        idx = self._next
+        self._next = (idx + 1) % len(self._buffers)
+        buffer = self._buffers[idx]
+        if buffer is None or buffer.shape[0] < count or buffer.shape[1:3] != (height, width):
+            buffer = np.empty((max(count, VIDEO_BATCH_SIZE), height, width, 3), dtype=np.uint8)
+            self._buffers[idx] = buffer
+        return buffer[:count]
+
+
+def _letterbox_batch(
+    frames: List[np.ndarray], staging: _HostFrameBuffers
+) -> Tuple[Any, Optional[List[Tuple[float, int, int]]]]:
+    height, width = frames[0].shape[:2]
+    if any(frame.shape[:2] != (height, width) for frame in frames):
+        return frames, None
+    # Letterbox into a reused buffer; Ultralytics then finds frames already at model size and skips its resize.
+    batch = staging.take(len(frames), *_letterbox_shape(height, width))
+    letterbox = [_letterbox_into(frame, batch[idx]) for idx, frame in enumerate(frames)]
+    return list(batch), letterbox
+
+
+def _prepare_batch(
+    model: Any, frames: List[np.ndarray], staging: Optional[_HostFrameBuffers] = None
+) -> Tuple[Any, Optional[List[Tuple[float, int, int]]]]:
+    if isinstance(model, InferenceClient):
+        return frames, None
+    if _predict_options.get("device") is not None:
+        # Only _load_model() sets a device, so stand-in models never receive CUDA tensors. Note that with
+        # tensor input Ultralytics' postprocess copies the whole batch back to the host for each result's
+        # orig_img, which gives back much of the upload saved here.
+        return _preprocess_batch(frames)
+    if staging is None:
+        return frames, None
+    return _letterbox_batch(frames, staging)
+
+
+def _predict_prepared(
+    model: Any,
+    frames: List[np.ndarray],
+    source: Any,
+    letterbox: Optional[List[Tuple[float, int, int]]],
+    conf: float,
+) -> List[List[Dict[str, Any]]]:
+    if isinstance(model, InferenceClient):
+        return model.predict_boxes(frames, conf)
+
+    # Ultralytics predictors keep per-call state, so threads take turns on the in-process model.
+    with _predict_lock, torch.inference_mode():
+        results = model.predict(source, conf=conf, verbose=False, **_predict_options)
+    names = _class_names(model)
+    if letterbox is None:
+        return [_results_to_boxes(result, names) for result in results]
+    return [
+        _unletterbox_boxes(_results_to_boxes(result, names), *params, frame.shape[1], frame.shape[0])
+        for result, params, frame in zip(results, letterbox, frames)
+    ]
+
+
+def _predict_boxes(model: Any, frames: List[np.ndarray], conf: float) -> List[List[Dict[str, Any]]]:
+    source, letterbox = _prepare_batch(model, frames)
+    return _predict_prepared(model, frames, source, letterbox, conf)
+
+
 def _to_float(value: Any, default: float) -> float:
     try:
         return float(value)
@@ -326,58 +840,234 @@ def _to_float(value: Any, default: float) -> float:
         return default
 
 
-def _detect_video_samples(video_path: str, conf: float, stride: int, max_frames: int) -> Dict[str, Any]:
+def _decode_image(data: Any) -> Optional[np.ndarray]:
     import cv2
 
-    capture = cv2.VideoCapture(video_path)
-    if not capture.isOpened():
-        raise ValueError("Could not open uploaded video")
+    # BGR ndarray, the layout Ultralytics expects for numpy inputs.
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        img = _decode_image_with_pil(data)
+    return img
 
-    fps = _to_float(capture.get(cv2.CAP_PROP_FPS), 0.0)
-    if fps <= 0:
-        fps = 0.0
 
-    model = get_model()
-    frame_index = 0
-    sampled: List[Dict[str, Any]] = []
+def _decode_image_with_pil(data: Any) -> Optional[np.ndarray]:
+    """Fallback for formats OpenCV cannot read (TGA, ICO, PCX, ...); returns BGR like ``cv2.imdecode``."""
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            # Only palette/alpha/greyscale images need converting; RGB ones would just be copied.
+            rgb = np.asarray(image if image.mode == "RGB" else image.convert("RGB"))
+    except (UnidentifiedImageError, OSError, ValueError):
+        return None
+    return np.ascontiguousarray(rgb[:, :, ::-1])
+
+
+def _decode_upload(fileobj: BinaryIO) -> Optional[np.ndarray]:
+    fileobj.seek(0)
+    spool = getattr(fileobj, "_file", None)
+    if isinstance(spool, io.BytesIO):
+        # Small uploads live in memory; decode from a view instead of copying them out with read().
+        view = spool.getbuffer()
+        try:
+            return _decode_image(view)
+        finally:
+            view.release()
+    return _decode_image(fileobj.read())
 
-    while True:
+
+def _copy_upload_to_temp(fileobj: BinaryIO, suffix: str) -> str:
+    fileobj.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        try:
+            shutil.copyfileobj(fileobj, tmp, UPLOAD_CHUNK_BYTES)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+    return tmp.name
+
+
+def _spooled_upload_path(upload: UploadFile) -> Optional[str]:
+    """Path of the temp file Starlette already spooled a large upload into, where the OS exposes one."""
+    fileobj = upload.file
+    if not getattr(fileobj, "_rolled", False):
+        return None
+    try:
+        fileobj.flush()
+        path = f"/proc/self/fd/{fileobj.fileno()}"
+    except (OSError, ValueError):
+        return None
+    return path if os.path.exists(path) else None
+
+
+def _open_video_capture(cv2: Any, video_path: str) -> Any:
+    """Open through FFmpeg with hardware decode (VAAPI/NVDEC/...) when this OpenCV build supports it."""
+    backend = getattr(cv2, "CAP_FFMPEG", None)
+    hw_prop = getattr(cv2, "CAP_PROP_HW_ACCELERATION", None)
+    hw_any = getattr(cv2, "VIDEO_ACCELERATION_ANY", None)
+    if backend is not None and hw_prop is not None and hw_any is not None:
+        try:
+            capture = cv2.VideoCapture(video_path, backend, [hw_prop, hw_any])
+        except Exception:
+            capture = None
+        if capture is not None and capture.isOpened():
+            return capture
+        if capture is not None:
+            capture.release()
+        logger.debug("FFmpeg capture with hardware decode unavailable for %s; using default backend", video_path)
+    return cv2.VideoCapture(video_path)
+
+
+def _sample_by_seeking(
+    capture: Any, cv2: Any, targets: range, add_sample: Callable[[int, np.ndarray], None]
+) -> bool:
+    for target in targets:
+        if not capture.set(cv2.CAP_PROP_POS_FRAMES, target):
+            return False
+        if int(round(_to_float(capture.get(cv2.CAP_PROP_POS_FRAMES), -1.0))) != target:
+            return False
         ok, frame = capture.read()
         if not ok:
+            # Header frame counts can overshoot; treat a failed read as end of stream.
             break
+        add_sample(target, frame)
+    return True
 
-        should_sample = frame_index % stride == 0 and len(sampled) < max_frames
-        if should_sample:
-            req_time = time.time()
-            req_iso = _now_iso()
 
-            results = model.predict(frame, conf=conf, verbose=False)
-            boxes = _results_to_boxes(results[0], model.names)
+def _detect_video_samples(video_path: str, conf: float, stride: int, max_frames: int) -> Dict[str, Any]:
+    import cv2
 
-            done_time = time.time()
-            duration_ms = int(round((done_time - req_time) * 1000))
-            done_iso = _now_iso()
+    capture = _open_video_capture(cv2, video_path)
+    if not capture.isOpened():
+        raise ValueError("Could not open uploaded video")
 
-            sampled.append(
-                {
-                    "frame_index": frame_index,
-                    "time_sec": round((frame_index / fps), 3) if fps > 0 else None,
-                    "count": len(boxes),
-                    "boxes": boxes,
-                    "detection_request_at": req_iso,
-                    "detection_completed_at": done_iso,
-                    "detection_duration": duration_ms,
-                }
-            )
+    fps = _to_float(capture.get(cv2.CAP_PROP_FPS), 0.0)
+    if fps <= 0:
+        fps = 0.0
 
-        frame_index += 1
+    model = get_model()
+    sampled: List[Dict[str, Any]] = []
+    pending_frames: List[np.ndarray] = []
+    pending_indices: List[int] = []
+    queued = 0
+    # Two host buffers are enough: at most one batch is in flight while the next one is prepared.
+    staging = _HostFrameBuffers()
+    # Inference runs on its own thread so the next batch decodes while the current one predicts.
+    inference = ThreadPoolExecutor(max_workers=1, thread_name_prefix="video-inference")
+    in_flight: Optional[Future] = None
+
+    def run_batch(
+        frames: List[np.ndarray], indices: List[int], source: Any, letterbox: Any
+    ) -> List[Dict[str, Any]]:
+        req_ns = time.time_ns()
+        batch_boxes = _predict_prepared(model, frames, source, letterbox, conf)
+        done_ns = time.time_ns()
+
+        req_iso = _iso_from_ns(req_ns)
+        done_iso = _iso_from_ns(done_ns)
+        # One predict call covers the whole batch; attribute its cost evenly per frame.
+        duration_ms = _duration_ms(req_ns, done_ns, len(frames))
+
+        return [
+            {
+                "frame_index": index,
+                "time_sec": round((index / fps), 3) if fps > 0 else None,
+                "count": len(boxes),
+                "boxes": boxes,
+                "detection_request_at": req_iso,
+                "detection_completed_at": done_iso,
+                "detection_duration": duration_ms,
+            }
+            for index, boxes in zip(indices, batch_boxes)
+        ]
+
+    def collect() -> None:
+        nonlocal in_flight
+        if in_flight is not None:
+            sampled.extend(in_flight.result())
+            in_flight = None
+
+    def flush_pending() -> None:
+        nonlocal in_flight
+        if not pending_frames:
+            return
+
+        frames, indices = list(pending_frames), list(pending_indices)
+        pending_frames.clear()
+        pending_indices.clear()
+        source, letterbox = _prepare_batch(model, frames, staging)
+        # Keep at most one batch in flight so memory stays bounded to two batches.
+        collect()
+        in_flight = inference.submit(run_batch, frames, indices, source, letterbox)
+
+    def add_sample(index: int, frame: np.ndarray) -> None:
+        nonlocal queued
+        pending_frames.append(frame)
+        pending_indices.append(index)
+        queued += 1
+        if len(pending_frames) >= VIDEO_BATCH_SIZE:
+            flush_pending()
 
-    capture.release()
-    return {"frame_count": frame_index, "sampled_count": len(sampled), "samples": sampled}
+    try:
+        frame_count: Optional[int] = None
+        total_frames = int(_to_float(capture.get(cv2.CAP_PROP_FRAME_COUNT), 0.0))
+        if stride >= VIDEO_SEEK_MIN_STRIDE and total_frames > 0:
+            targets = range(0, total_frames, stride)[:max_frames]
+            if _sample_by_seeking(capture, cv2, targets, add_sample):
+                frame_count = total_frames
+            else:
+                logger.info("Frame seek was inaccurate for %s; decoding sequentially", video_path)
+                collect()
+                capture.release()
+                sampled.clear()
+                pending_frames.clear()
+                pending_indices.clear()
+                queued = 0
+                capture = _open_video_capture(cv2, video_path)
+
+        if frame_count is None:
+            frame_index = 0
+            while True:
+                # grab() only demuxes; skipped frames are never converted to BGR.
+                if not capture.grab():
+                    break
+
+                if frame_index % stride == 0:
+                    ok, frame = capture.retrieve()
+                    if not ok:
+                        break
+                    add_sample(frame_index, frame)
+
+                frame_index += 1
+                if queued >= max_frames:
+                    break
+            # The container header is free to read; fall back to frames inspected when it is missing.
+            frame_count = total_frames if total_frames > 0 else frame_index
+
+        flush_pending()
+        collect()
+    finally:
+        inference.shutdown(wait=True)
+        capture.release()
+    return {"frame_count": frame_count, "sampled_count": len(sampled), "samples": sampled}
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="AI Image Recognition", version="0.1.0")
+    app = FastAPI(title="AI Image Recognition", version="0.1.0", default_response_class=ORJSONResponse)
+    inference_slots = asyncio.Semaphore(INFER_CONCURRENCY)
+    app.state.inference_slots = inference_slots
+    inference_batcher = _InferenceBatcher(slots=inference_slots)
+    app.state.inference_batcher = inference_batcher
+    lan_ip_cache = _TimedCache(lambda: _lan_ip_candidates(), LAN_IP_CACHE_TTL_SEC)
+    app.state.lan_ip_cache = lan_ip_cache
+    app.state.relay_path = None
+
+    def relay_script_path() -> Path:
+        # Written once per app (normally by the startup hook); later polls only stat it and rewrite it
+        # if it was deleted while the app runs.
+        if app.state.relay_path is None or not app.state.relay_path.exists():
+            app.state.relay_path = _ensure_signaling_relay_script()
+        return app.state.relay_path
 
     # DEV CORS configuration for browser-based health/debug flows.
     app.add_middleware(
@@ -408,6 +1098,20 @@ def create_app() -> FastAPI:
     async def log_network_info() -> None:
         port = int(os.getenv("PORT", os.getenv("UVICORN_PORT", "8000")))
         _log_network_access_urls(port)
+        relay_script_path()
+        if os.getenv("AI_PRELOAD_MODEL", "1") != "0":
+            # Load and warm the model in the background so the first request does not pay for it.
+            asyncio.get_running_loop().run_in_executor(None, _preload_model)
+        try:
+            # `kill -HUP` refreshes LAN addresses after a network change instead of waiting out the TTL.
+            asyncio.get_running_loop().add_signal_handler(signal.SIGHUP, lan_ip_cache.clear)
+        except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+            # No SIGHUP on Windows, and handlers can only be installed from the main thread.
+            pass
+
+    @app.on_event("shutdown")
+    async def flush_analytics_log() -> None:
+        _analytics_writer.close()
 
     @app.get("/health")
     def health(request: Request) -> Dict[str, str | bool]:
@@ -427,41 +1131,7 @@ def create_app() -> FastAPI:
 
     @app.get("/webrtc/network")
     def webrtc_network() -> Dict[str, Any]:
-        candidates = _lan_ip_candidates()
-        warning = candidates == ["127.0.0.1"]
-        return {
-            "ipCandidates": candidates,
-            "selectedIp": candidates[0],
-            "warning": warning,
-        }
-
-    @app.get("/webrtc/relay-info")
-    def webrtc_relay_info() -> Dict[str, Any]:
-        relay_path = _ensure_signaling_relay_script()
-        return {
-            "relayPath": str(relay_path),
-            "relayExists": relay_path.exists(),
-            "runCommands": [f"cd {relay_path.parent}", "python server.py"],
-            "relayCode": relay_path.read_text(encoding="utf-8"),
-        }
-
-    @app.get("/webrtc/phone-publisher")
-    def webrtc_phone_publisher(ip: Optional[str] = Query(default=None)) -> Dict[str, Any]:
-        candidates = _lan_ip_candidates()
-        selected = ip.strip() if ip and ip.strip() else candidates[0]
-        if selected not in candidates:
-            candidates = sorted(set(candidates + [selected]))
-        warning = candidates == ["127.0.0.1"]
-        return {
-            "ipCandidates": candidates,
-            "selectedIp": selected,
-            "warning": warning,
-            "html": _phone_publisher_html(selected, signaling_port=8765),
-        }
-
-    @app.get("/webrtc/network")
-    def webrtc_network() -> Dict[str, Any]:
-        candidates = _lan_ip_candidates()
+        candidates = lan_ip_cache.get()
         warning = candidates == ["127.0.0.1"]
         return {
             "ipCandidates": candidates,
@@ -471,17 +1141,17 @@ def create_app() -> FastAPI:
 
     @app.get("/webrtc/relay-info")
     def webrtc_relay_info() -> Dict[str, Any]:
-        relay_path = _ensure_signaling_relay_script()
+        relay_path = relay_script_path()
         return {
             "relayPath": str(relay_path),
             "relayExists": relay_path.exists(),
             "runCommands": [f"cd {relay_path.parent}", "python server.py"],
-            "relayCode": relay_path.read_text(encoding="utf-8"),
+            "relayCode": SIGNALING_RELAY_SOURCE,
         }
 
     @app.get("/webrtc/phone-publisher")
     def webrtc_phone_publisher(ip: Optional[str] = Query(default=None)) -> Dict[str, Any]:
-        candidates = _lan_ip_candidates()
+        candidates = lan_ip_cache.get()
         selected = ip.strip() if ip and ip.strip() else candidates[0]
         if selected not in candidates:
             candidates = sorted(set(candidates + [selected]))
@@ -496,21 +1166,19 @@ def create_app() -> FastAPI:
     @app.post("/detect")
     @app.post("/api/detect")
     async def detect(file: UploadFile = File(...), conf: float = 0.25) -> Dict[str, Any]:
-        data = await file.read()
-        img = Image.open(io.BytesIO(data)).convert("RGB")
+        # Read and decode in one pool task; cv2.imdecode releases the GIL, so concurrent uploads decode in parallel.
+        img = await asyncio.get_running_loop().run_in_executor(DECODE_POOL, _decode_upload, file.file)
+        if img is None:
+            return ORJSONResponse(status_code=400, content={"error": "Could not decode uploaded image"})
 
-        req_time = time.time()
-        req_iso = _now_iso()
+        req_ns = time.time_ns()
 
         try:
-            model = get_model()
-            results = model.predict(img, conf=float(conf), verbose=False)
-            r = results[0]
-
-            boxes = _results_to_boxes(r, model.names)
-            done_time = time.time()
-            duration_ms = int(round((done_time - req_time) * 1000))
-            done_iso = _now_iso()
+            boxes = await inference_batcher.predict(img, float(conf))
+            done_ns = time.time_ns()
+            req_iso = _iso_from_ns(req_ns)
+            done_iso = _iso_from_ns(done_ns)
+            duration_ms = _duration_ms(req_ns, done_ns)
 
             payload = {
                 "count": len(boxes),
@@ -531,7 +1199,7 @@ def create_app() -> FastAPI:
             return payload
         except Exception as exc:
             logger.exception("Detection failed")
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=500,
                 content={"error": "Detection failed", "message": str(exc)},
             )
@@ -544,30 +1212,38 @@ def create_app() -> FastAPI:
         max_frames: int = 20,
     ) -> Dict[str, Any]:
         if stride < 1:
-            return JSONResponse(status_code=400, content={"error": "stride must be >= 1"})
+            return ORJSONResponse(status_code=400, content={"error": "stride must be >= 1"})
         if max_frames < 1:
-            return JSONResponse(status_code=400, content={"error": "max_frames must be >= 1"})
+            return ORJSONResponse(status_code=400, content={"error": "max_frames must be >= 1"})
 
-        data = await file.read()
         suffix = ".mp4"
         if file.filename and "." in file.filename:
             suffix = "." + file.filename.rsplit(".", 1)[1]
 
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-                tmp.write(data)
-                temp_path = tmp.name
-
-            started_at = _now_iso()
-            t0 = time.time()
-            payload = _detect_video_samples(
-                video_path=temp_path,
-                conf=float(conf),
-                stride=int(stride),
-                max_frames=int(max_frames),
-            )
-            duration_ms = int(round((time.time() - t0) * 1000))
-            completed_at = _now_iso()
+            video_path = _spooled_upload_path(file)
+            if video_path is None:
+                temp_path = await asyncio.get_running_loop().run_in_executor(
+                    None, _copy_upload_to_temp, file.file, suffix
+                )
+                video_path = temp_path
+
+            started_ns = time.time_ns()
+            async with inference_slots:
+                payload = await asyncio.get_running_loop().run_in_executor(
+                    None,
+                    functools.partial(
+                        _detect_video_samples,
+                        video_path=video_path,
+                        conf=float(conf),
+                        stride=int(stride),
+                        max_frames=int(max_frames),
+                    ),
+                )
+            completed_ns = time.time_ns()
+            started_at = _iso_from_ns(started_ns)
+            completed_at = _iso_from_ns(completed_ns)
+            duration_ms = _duration_ms(started_ns, completed_ns)
 
             _append_analysis_log(
                 {
@@ -586,10 +1262,10 @@ def create_app() -> FastAPI:
             )
             return payload
         except ValueError as exc:
-            return JSONResponse(status_code=400, content={"error": str(exc)})
+            return ORJSONResponse(status_code=400, content={"error": str(exc)})
         except Exception as exc:
             logger.exception("Video detection failed")
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=500,
                 content={"error": "Video detection failed", "message": str(exc)},
             )
@@ -604,3 +1280,4 @@ def create_app() -> FastAPI:
 
 
 app = create_app()
+
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import os
+
+import uvicorn
+
+
+def main() -> None:
+    # uvloop and httptools ship with uvicorn[standard]; name them so a missing one fails loudly
+    # instead of silently falling back to the slower asyncio loop and h11 parser. Living outside
+    # app.main keeps that module from being imported twice (once as __main__, once by uvicorn).
+    uvicorn.run(
+        "app.main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", os.getenv("UVICORN_PORT", "8000"))),
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WORKERS", "1")),
+    )
+
+
+if __name__ == "__main__":
+    main()
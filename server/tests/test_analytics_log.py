@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import json
+import time
+
+from app import main
+from app.main import _AnalyticsLogWriter
+
+
+def test_analytics_writer_appends_lines_and_flushes_on_close(tmp_path) -> None:
+    log_file = tmp_path / "logs" / "detection_analytics.jsonl"
+    writer = _AnalyticsLogWriter(log_file)
+
+    writer.write(json.dumps({"endpoint": "/detect"}).encode("utf-8") + b"\n")
+    writer.write(json.dumps({"endpoint": "/detect-video"}).encode("utf-8") + b"\n")
+    writer.close()
+
+    rows = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    assert [row["endpoint"] for row in rows] == ["/detect", "/detect-video"]
+
+
+def test_analytics_writer_restarts_after_close(tmp_path) -> None:
+    log_file = tmp_path / "detection_analytics.jsonl"
+    writer = _AnalyticsLogWriter(log_file)
+
+    writer.write(b"first\n")
+    writer.close()
+    writer.write(b"second\n")
+    writer.close()
+
+    assert log_file.read_text(encoding="utf-8").splitlines() == ["first", "second"]
+
+
+def test_analytics_writer_flushes_after_entry_limit(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(main, "ANALYTICS_FLUSH_ENTRIES", 2)
+    monkeypatch.setattr(main, "ANALYTICS_FLUSH_INTERVAL_SEC", 60.0)
+    log_file = tmp_path / "detection_analytics.jsonl"
+    writer = _AnalyticsLogWriter(log_file)
+
+    writer.write(b"first\n")
+    writer.write(b"second\n")
+    deadline = time.monotonic() + 2.0
+    while time.monotonic() < deadline and not (log_file.exists() and log_file.read_bytes()):
+        time.sleep(0.01)
+
+    assert log_file.read_text(encoding="utf-8").splitlines() == ["first", "second"]
+    writer.close()
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
 import io
 from dataclasses import dataclass
+from types import SimpleNamespace
 
 from fastapi.testclient import TestClient
 import numpy as np
@@ -51,3 +53,59 @@ def test_detect_returns_boxes(monkeypatch):
     assert j["boxes"][0]["name"] == "resistor"
     assert abs(j["boxes"][0]["score"] - 0.9) < 1e-9
     assert j["boxes"][0]["xyxy"] == [10.0, 20.0, 110.0, 220.0]
+
+
+def test_detect_rejects_undecodable_image(monkeypatch):
+    monkeypatch.setattr(main, "get_model", lambda: _FakeModel())
+
+    app = main.create_app()
+    client = TestClient(app)
+
+    r = client.post(
+        "/detect",
+        files={"file": ("test.png", b"not-an-image", "image/png")},
+    )
+    assert r.status_code == 400
+    assert r.json()["error"] == "Could not decode uploaded image"
+
+
+def test_decode_image_falls_back_to_pil_for_formats_opencv_cannot_read():
+    buf = io.BytesIO()
+    Image.new("RGB", (6, 4), (255, 0, 0)).save(buf, format="TGA")
+
+    img = main._decode_image(buf.getvalue())
+
+    assert img.shape == (4, 6, 3)
+    assert img[0, 0].tolist() == [0, 0, 255]
+
+
+def test_decode_image_pil_fallback_converts_non_rgb_modes():
+    buf = io.BytesIO()
+    Image.new("L", (3, 2), 90).save(buf, format="TGA")
+
+    img = main._decode_image(buf.getvalue())
+
+    assert img.shape == (2, 3, 3)
+    assert img[1, 2].tolist() == [90, 90, 90]
+
+
+def test_inference_batcher_coalesces_concurrent_requests(monkeypatch):
+    batch_sizes = []
+
+    class _BatchModel:
+        names = {0: "resistor"}
+
+        def predict(self, imgs, conf=0.25, verbose=False):
+            batch_sizes.append(len(imgs))
+            return [SimpleNamespace(boxes=[]) for _ in imgs]
+
+    monkeypatch.setattr(main, "get_model", lambda: _BatchModel())
+
+    async def run():
+        batcher = main._InferenceBatcher(max_batch=8, max_wait_ms=10)
+        return await asyncio.gather(*(batcher.predict(i, 0.25) for i in range(3)))
+
+    outputs = asyncio.run(run())
+
+    assert batch_sizes == [3]
+    assert outputs == [[], [], []]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import io
+import os
 import sys
 from types import SimpleNamespace
 
@@ -14,6 +15,7 @@ class _FakeCapture:
     def __init__(self, _path: str):
         self._frames = [np.zeros((4, 4, 3), dtype=np.uint8) for _ in range(4)]
         self._idx = 0
+        self.retrieved = []
 
     def isOpened(self):
         return True
@@ -24,31 +26,81 @@ class _FakeCapture:
         return 0.0
 
     def read(self):
-        if self._idx >= len(self._frames):
+        if not self.grab():
             return False, None
-        frame = self._frames[self._idx]
+        return self.retrieve()
+
+    def grab(self):
+        if self._idx >= len(self._frames):
+            return False
         self._idx += 1
-        return True, frame
+        return True
+
+    def retrieve(self):
+        self.retrieved.append(self._idx - 1)
+        return True, self._frames[self._idx - 1]
 
     def release(self):
         return None
 
 
+class _SeekableCapture(_FakeCapture):
+    def __init__(self, path: str, frame_total: int = 400):
+        super().__init__(path)
+        self._frames = [np.zeros((4, 4, 3), dtype=np.uint8) for _ in range(frame_total)]
+        self.reads = 0
+
+    def get(self, prop):
+        if prop == 7:
+            return float(len(self._frames))
+        if prop == 1:
+            return float(self._idx)
+        return super().get(prop)
+
+    def set(self, prop, value):
+        assert prop == 1
+        self._idx = int(value)
+        return True
+
+    def read(self):
+        self.reads += 1
+        return super().read()
+
+
+def _fake_resize(frame, size, interpolation=None):
+    return np.zeros((size[1], size[0]) + frame.shape[2:], dtype=frame.dtype)
+
+
+def _fake_cv2(capture_cls):
+    return SimpleNamespace(
+        VideoCapture=capture_cls,
+        CAP_PROP_FPS=5,
+        CAP_PROP_FRAME_COUNT=7,
+        CAP_PROP_POS_FRAMES=1,
+        INTER_LINEAR=1,
+        resize=_fake_resize,
+    )
+
+
 class _FakeModel:
     names = {0: 'object'}
 
-    def predict(self, _frame, conf=0.25, verbose=False):
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, frames, conf=0.25, verbose=False):
         assert conf == 0.25
+        self.batch_sizes.append(len(frames))
         return [SimpleNamespace(boxes=SimpleNamespace(
             xyxy=np.array([[1.0, 2.0, 3.0, 4.0]]),
             conf=np.array([0.8]),
             cls=np.array([0]),
-        ))]
+        )) for _ in frames]
 
 
 def test_detect_video_returns_sampled_frames(monkeypatch):
     monkeypatch.setattr(main, 'get_model', lambda: _FakeModel())
-    monkeypatch.setitem(sys.modules, 'cv2', SimpleNamespace(VideoCapture=_FakeCapture, CAP_PROP_FPS=5))
+    monkeypatch.setitem(sys.modules, 'cv2', _fake_cv2(_FakeCapture))
 
     app = main.create_app()
     client = TestClient(app)
@@ -68,6 +120,133 @@ def test_detect_video_returns_sampled_frames(monkeypatch):
     assert data['samples'][0]['boxes'][0]['name'] == 'object'
 
 
+def test_detect_video_only_retrieves_sampled_frames(monkeypatch):
+    captures = []
+
+    def make_capture(path):
+        capture = _FakeCapture(path)
+        captures.append(capture)
+        return capture
+
+    monkeypatch.setattr(main, 'get_model', lambda: _FakeModel())
+    monkeypatch.setitem(sys.modules, 'cv2', _fake_cv2(make_capture))
+
+    payload = main._detect_video_samples('sample.mp4', conf=0.25, stride=3, max_frames=20)
+
+    assert [sample['frame_index'] for sample in payload['samples']] == [0, 3]
+    assert captures[0].retrieved == [0, 3]
+
+
+def test_detect_video_batches_sampled_frames(monkeypatch):
+    model = _FakeModel()
+    monkeypatch.setattr(main, 'get_model', lambda: model)
+    monkeypatch.setattr(main, 'VIDEO_BATCH_SIZE', 2)
+    monkeypatch.setitem(sys.modules, 'cv2', _fake_cv2(_FakeCapture))
+
+    payload = main._detect_video_samples('sample.mp4', conf=0.25, stride=1, max_frames=3)
+
+    assert model.batch_sizes == [2, 1]
+    assert [sample['frame_index'] for sample in payload['samples']] == [0, 1, 2]
+    # Decoding stops once max_frames are sampled and no header count is available.
+    assert payload['frame_count'] == 3
+
+
+def test_open_video_capture_prefers_ffmpeg_hardware_decode():
+    opened = []
+
+    def make_capture(path, *args):
+        opened.append(args)
+        return _FakeCapture(path)
+
+    cv2 = SimpleNamespace(
+        VideoCapture=make_capture, CAP_FFMPEG=1900, CAP_PROP_HW_ACCELERATION=50, VIDEO_ACCELERATION_ANY=1
+    )
+
+    main._open_video_capture(cv2, 'sample.mp4')
+
+    assert opened == [(1900, [50, 1])]
+
+
+def test_open_video_capture_falls_back_when_hardware_open_fails():
+    opened = []
+
+    class _ClosedCapture(_FakeCapture):
+        def isOpened(self):
+            return False
+
+    def make_capture(path, *args):
+        opened.append(args)
+        return _ClosedCapture(path) if args else _FakeCapture(path)
+
+    cv2 = SimpleNamespace(
+        VideoCapture=make_capture, CAP_FFMPEG=1900, CAP_PROP_HW_ACCELERATION=50, VIDEO_ACCELERATION_ANY=1
+    )
+
+    capture = main._open_video_capture(cv2, 'sample.mp4')
+
+    assert capture.isOpened()
+    assert opened == [(1900, [50, 1]), ()]
+
+
+def test_detect_video_stops_decoding_after_max_frames(monkeypatch):
+    captures = []
+
+    def make_capture(path):
+        capture = _SeekableCapture(path, frame_total=100)
+        captures.append(capture)
+        return capture
+
+    monkeypatch.setattr(main, 'get_model', lambda: _FakeModel())
+    monkeypatch.setitem(sys.modules, 'cv2', _fake_cv2(make_capture))
+
+    payload = main._detect_video_samples('sample.mp4', conf=0.25, stride=10, max_frames=2)
+
+    assert [sample['frame_index'] for sample in payload['samples']] == [0, 10]
+    # The tail of the video is never grabbed, yet the full length still comes from the header.
+    assert captures[0].retrieved == [0, 10]
+    assert captures[0]._idx == 11
+    assert payload['frame_count'] == 100
+
+
+def test_detect_video_seeks_to_sampled_frames_for_large_strides(monkeypatch):
+    captures = []
+
+    def make_capture(path):
+        capture = _SeekableCapture(path)
+        captures.append(capture)
+        return capture
+
+    monkeypatch.setattr(main, 'get_model', lambda: _FakeModel())
+    monkeypatch.setitem(sys.modules, 'cv2', _fake_cv2(make_capture))
+
+    payload = main._detect_video_samples('sample.mp4', conf=0.25, stride=150, max_frames=20)
+
+    assert [sample['frame_index'] for sample in payload['samples']] == [0, 150, 300]
+    assert payload['frame_count'] == 400
+    assert captures[0].reads == 3
+
+
+def test_detect_video_reads_large_uploads_from_starlette_spool(monkeypatch):
+    opened = []
+
+    def make_capture(path):
+        opened.append(path)
+        return _FakeCapture(path)
+
+    monkeypatch.setattr(main, 'get_model', lambda: _FakeModel())
+    monkeypatch.setitem(sys.modules, 'cv2', _fake_cv2(make_capture))
+
+    client = TestClient(main.create_app())
+    response = client.post(
+        '/detect-video?stride=2',
+        files={'file': ('sample.mp4', b'v' * (2 * 1024 * 1024), 'video/mp4')},
+    )
+
+    assert response.status_code == 200
+    if os.path.isdir('/proc/self/fd'):
+        assert opened[0].startswith('/proc/self/fd/')
+
+
 def test_detect_video_validates_limits():
     app = main.create_app()
     client = TestClient(app)
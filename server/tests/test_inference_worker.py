@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from multiprocessing.connection import Listener
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import app.main as main
+from app.inference_worker import InferenceClient, InferenceServer, _PendingRequest, inference_authkey
+
+
+class _FakeModel:
+    names = {0: "object", 1: "person"}
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, frames, conf=0.25, verbose=False):
+        self.batch_sizes.append(len(frames))
+        return [
+            SimpleNamespace(boxes=SimpleNamespace(
+                xyxy=np.array([[0.0, 0.0, float(frame.shape[1]), float(frame[0, 0, 0])]]),
+                conf=np.array([conf]),
+                cls=np.array([1]),
+            ))
+            for frame in frames
+        ]
+
+
+def test_inference_client_round_trips_frames_through_worker() -> None:
+    model = _FakeModel()
+    server = InferenceServer(model, Listener(("127.0.0.1", 0), authkey=b"test"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        client = InferenceClient(server.address, b"test")
+        frames = [np.full((4, 6, 3), 7, dtype=np.uint8), np.full((2, 3, 3), 9, dtype=np.uint8)]
+
+        boxes = main._predict_boxes(client, frames, 0.5)
+
+        assert client.names == {0: "object", 1: "person"}
+        assert model.batch_sizes == [2]
+        assert [frame_boxes[0]["xyxy"] for frame_boxes in boxes] == [[0.0, 0.0, 6.0, 7.0], [0.0, 0.0, 3.0, 9.0]]
+        assert boxes[0][0]["name"] == "person"
+        assert boxes[0][0]["score"] == 0.5
+    finally:
+        server.close()
+        thread.join(timeout=2)
+
+
+def test_inference_authkey_is_required(monkeypatch) -> None:
+    monkeypatch.delenv("AI_INFERENCE_AUTHKEY", raising=False)
+    with pytest.raises(RuntimeError):
+        inference_authkey()
+
+    monkeypatch.setenv("AI_INFERENCE_AUTHKEY", "s3cret")
+    assert inference_authkey() == b"s3cret"
+
+
+def test_inference_server_never_exceeds_the_batch_limit() -> None:
+    model = _FakeModel()
+    server = InferenceServer(model, Listener(("127.0.0.1", 0), authkey=b"test"))
+    limit = main.VIDEO_BATCH_SIZE
+    image_batch = _PendingRequest(frames=[np.zeros((2, 2, 3), dtype=np.uint8)] * 8, conf=0.25)
+    video_batch = _PendingRequest(frames=[np.zeros((2, 2, 3), dtype=np.uint8)] * limit, conf=0.25)
+    oversized = _PendingRequest(frames=[np.zeros((2, 2, 3), dtype=np.uint8)] * (limit + 3), conf=0.25)
+    for request in (image_batch, video_batch, oversized):
+        server._requests.put(request)
+    server._requests.put(None)
+
+    try:
+        server.serve_forever()
+    finally:
+        server.close()
+
+    assert model.batch_sizes and max(model.batch_sizes) <= limit
+    assert sum(model.batch_sizes) == 8 + limit + limit + 3
+    assert [len(request.result) for request in (image_batch, video_batch, oversized)] == [8, limit, limit + 3]
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from app.main import _HostFrameBuffers, _letterbox_batch, _letterbox_into, _unletterbox_boxes
+
+
+def test_letterbox_pads_wide_frame_and_boxes_map_back() -> None:
+    frame = np.full((240, 320, 3), 200, dtype=np.uint8)
+    dst = np.empty((640, 640, 3), dtype=np.uint8)
+
+    scale, pad_x, pad_y = _letterbox_into(frame, dst)
+
+    assert scale == 2.0
+    assert (pad_x, pad_y) == (0, 80)
+    assert dst[0, 0].tolist() == [114, 114, 114]
+    assert dst[320, 320].tolist() == [200, 200, 200]
+
+    boxes = [{"name": "object", "score": 0.5, "xyxy": [20.0, 120.0, 220.0, 520.0]}]
+    mapped = _unletterbox_boxes(boxes, scale, pad_x, pad_y, 320, 240)
+    assert mapped[0]["xyxy"] == [10.0, 20.0, 110.0, 220.0]
+
+
+def test_unletterbox_clips_to_frame() -> None:
+    boxes = [{"name": "object", "score": 0.5, "xyxy": [-5.0, 0.0, 700.0, 700.0]}]
+    mapped = _unletterbox_boxes(boxes, 1.0, 0, 0, 640, 480)
+    assert mapped[0]["xyxy"] == [0.0, 0.0, 640.0, 480.0]
+
+
+def test_letterbox_batch_uses_stride_aligned_double_buffers() -> None:
+    staging = _HostFrameBuffers()
+    frames = [np.full((360, 640, 3), 200, dtype=np.uint8) for _ in range(2)]
+
+    first, params = _letterbox_batch(frames, staging)
+    second, _ = _letterbox_batch(frames, staging)
+    third, _ = _letterbox_batch(frames, staging)
+
+    assert [frame.shape for frame in first] == [(384, 640, 3), (384, 640, 3)]
+    assert params == [(1.0, 0, 12), (1.0, 0, 12)]
+    assert not np.shares_memory(first[0], second[0])
+    assert np.shares_memory(first[0], third[0])
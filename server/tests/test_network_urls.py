@@ -1,3 +1,7 @@
+import sys
+from types import SimpleNamespace
+
+import app.main as main
 from app.main import _network_urls_for_ips
 
 
@@ -8,3 +12,23 @@ def test_network_urls_filters_loopback_and_link_local() -> None:
     )
 
     assert urls == ["http://10.0.0.22:8000", "http://192.168.1.15:8000"]
+
+
+def test_discover_local_ips_prefers_interface_table(monkeypatch) -> None:
+    fake_netifaces = SimpleNamespace(
+        AF_INET=2,
+        interfaces=lambda: ["lo", "eth0", "wlan0"],
+        ifaddresses=lambda iface: {
+            "lo": {2: [{"addr": "127.0.0.1"}]},
+            "eth0": {2: [{"addr": "192.168.1.15"}]},
+            "wlan0": {},
+        }[iface],
+    )
+    monkeypatch.setitem(sys.modules, "netifaces", fake_netifaces)
+
+    def fail(*_args):
+        raise AssertionError("socket discovery should not run")
+
+    monkeypatch.setattr(main.socket, "gethostbyname_ex", fail)
+
+    assert main._discover_local_ips() == ["127.0.0.1", "192.168.1.15"]
@@ -7,7 +7,7 @@ import pytest
 
 torch = pytest.importorskip("torch")
 
-from app.main import _results_to_boxes, _to_numpy
+from app.main import _class_names, _results_to_boxes, _to_numpy
 
 
 @dataclass
@@ -73,3 +73,32 @@ def test_results_to_boxes_cuda_tensor():
 
     output = _results_to_boxes(result, {0: "resistor"})
     _assert_box_payload(output)
+
+
+def test_results_to_boxes_unknown_class_falls_back_to_id():
+    boxes = _FakeBoxes(
+        xyxy=torch.tensor([[10.0, 20.0, 110.0, 220.0], [1.0, 2.0, 3.0, 4.0]]),
+        conf=torch.tensor([0.9, 0.5]),
+        cls=torch.tensor([0, 7]),
+    )
+
+    output = _results_to_boxes(_FakeResult(boxes), {0: "resistor"})
+
+    assert [box["name"] for box in output] == ["resistor", "7"]
+
+
+def test_class_names_reads_model_names_once_per_model():
+    class _Model:
+        reads = 0
+
+        @property
+        def names(self):
+            # Ultralytics builds a new dict on every access.
+            type(self).reads += 1
+            return {0: "resistor", 1: "capacitor"}
+
+    model = _Model()
+
+    assert _class_names(model) == ("resistor", "capacitor")
+    assert _class_names(model) == ("resistor", "capacitor")
+    assert _Model.reads == 1
@@ -22,6 +22,16 @@ def test_webrtc_relay_info_creates_and_returns_server_py(monkeypatch) -> None:
     assert SIGNALING_RELAY_FILE.exists()
 
 
+def test_webrtc_relay_info_rewrites_script_deleted_while_running() -> None:
+    client = TestClient(create_app())
+    assert client.get('/webrtc/relay-info').json()['relayExists'] is True
+
+    SIGNALING_RELAY_FILE.unlink()
+
+    assert client.get('/webrtc/relay-info').json()['relayExists'] is True
+    assert SIGNALING_RELAY_FILE.exists()
+
+
 def test_webrtc_network_falls_back_to_loopback(monkeypatch) -> None:
     import app.main as main
 
@@ -56,3 +66,31 @@ def test_webrtc_phone_publisher_returns_html_with_ws_url(monkeypatch) -> None:
     assert 'btnBack' in payload['html']
     assert 'id="log"' in payload['html']
     assert 'id="error"' in payload['html']
+
+
+def test_webrtc_network_caches_ip_discovery(monkeypatch) -> None:
+    import app.main as main
+
+    calls = []
+
+    def fake_discover():
+        calls.append(1)
+        return ['192.168.1.20']
+
+    monkeypatch.setattr(main, '_discover_local_ips', fake_discover)
+
+    app = create_app()
+    client = TestClient(app)
+    for _ in range(3):
+        assert client.get('/webrtc/network').json()['selectedIp'] == '192.168.1.20'
+
+    assert len(calls) == 1
+
+
+def test_phone_publisher_html_is_rendered_once_per_ip() -> None:
+    import app.main as main
+
+    first = main._phone_publisher_html('10.0.0.5', signaling_port=8765)
+
+    assert main._phone_publisher_html('10.0.0.5', signaling_port=8765) is first
+    assert 'Offer sent (${facingMode})' in first
@@ -1,83 +1,217 @@
 import asyncio
-import contextlib
+from collections import deque
 import json
-import threading
+import logging
+import socket
+import struct
 from datetime import datetime, timezone
-from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
-import websockets
+from websockets.asyncio.server import ServerConnection, serve
 from websockets.exceptions import ConnectionClosed
+from websockets.frames import Frame, Opcode
+from websockets.protocol import State
 
+try:
+    # Optional: libuv's event loop makes socket reads/writes noticeably cheaper than the default one.
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# websockets logs per-frame and per-handshake detail at DEBUG/INFO; keep it at WARNING so a verbose
+# root logger can never make the relay format those records on the hot path.
+logging.getLogger("websockets").setLevel(logging.WARNING)
+
+# Peers are released by relay()'s `finally`, which discards them here and rebuilds `peer_others`;
+# both hold strong references, so that explicit cleanup is what keeps closed connections from leaking.
 clients = set()
+# Every other peer of each peer, rebuilt only when a peer joins or leaves, so fan-out neither copies
+# the registry nor filters out the sender per message.
+peer_others = {}
 VERSION = "1.1.0"
 HEALTH_PORT = 8766
+# Unsent bytes a peer may accumulate before it is treated as stalled and disconnected.
+MAX_PEER_BACKLOG_BYTES = 1 << 20
+# Kernel send buffer per peer, so a fan-out burst lands in the socket rather than the transport buffer.
+PEER_SNDBUF_BYTES = 256 * 1024
 
 
-class HealthHandler(BaseHTTPRequestHandler):
-    def _write_json(self, status: int, payload: dict):
-        encoded = json.dumps(payload).encode("utf-8")
-        self.send_response(status)
-        self.send_header("Content-Type", "application/json")
-        self.send_header("Content-Length", str(len(encoded)))
-        self.end_headers()
-        self.wfile.write(encoded)
-
-    def do_GET(self):
-        if self.path == "/health":
-            self._write_json(
-                200,
-                {
-                    "ok": True,
-                    "service": "webrtc-signaling-relay",
-                    "ts": datetime.now(timezone.utc).isoformat(),
-                    "version": VERSION,
-                    "ws": "ws://0.0.0.0:8765",
-                    "http": f"http://0.0.0.0:{HEALTH_PORT}/health",
-                },
-            )
-            return
-        self._write_json(404, {"ok": False, "error": "not_found"})
-
-    def log_message(self, _format, *_args):
-        return
-
-
-def start_health_server():
-    server = ThreadingHTTPServer(("0.0.0.0", HEALTH_PORT), HealthHandler)
-    print(f"Health endpoint listening on http://0.0.0.0:{HEALTH_PORT}/health")
-    server.serve_forever()
+def _http_response(status: bytes, body: bytes) -> bytes:
+    head = b"HTTP/1.1 %s\r\nContent-Type: application/json\r\nContent-Length: %d\r\nConnection: close\r\n\r\n"
+    return head % (status, len(body)) + body
+
+
+# Everything but the timestamp is fixed, so each probe only formats `ts` onto a pre-encoded prefix.
+_HEALTH_PREFIX = json.dumps(
+    {
+        "ok": True,
+        "service": "webrtc-signaling-relay",
+        "version": VERSION,
+        "ws": "ws://0.0.0.0:8765",
+        "http": f"http://0.0.0.0:{HEALTH_PORT}/health",
+    }
+)[:-1].encode("utf-8") + b', "ts": "'
+_HEALTH_REQUEST_LINE = b"GET /health HTTP/1."
+_NOT_FOUND_RESPONSE = _http_response(b"404 Not Found", json.dumps({"ok": False, "error": "not_found"}).encode("utf-8"))
+
+
+def _health_response() -> bytes:
+    ts = datetime.now(timezone.utc).isoformat()
+    return _http_response(b"200 OK", _HEALTH_PREFIX + ts.encode("ascii") + b'"}')
+
+
+async def handle_health(reader, writer):
+    """Answers one HTTP request on the health port from the relay's own event loop."""
+    try:
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=5)
+        if head.startswith(_HEALTH_REQUEST_LINE):
+            response = _health_response()
+        else:
+            response = _NOT_FOUND_RESPONSE
+        writer.write(response)
+        await writer.drain()
+    except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, OSError):
+        pass
+    finally:
+        writer.close()
+
+
+class RelayConnection(ServerConnection):
+    """Hands messages out as raw bytes plus their frame type, so relaying never UTF-8 decodes text.
+
+    The relay only forwards payloads; validating text is left to the receiving peers.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._text_flags = deque()
+
+    def connection_made(self, transport):
+        super().connection_made(transport)
+        sock = transport.get_extra_info("socket")
+        if sock is not None:
+            # asyncio and uvloop normally enable TCP_NODELAY already; set it explicitly so small
+            # signaling messages are never held back by Nagle's algorithm.
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, PEER_SNDBUF_BYTES)
+
+    def process_event(self, event):
+        # The first frame of every message carries its type; continuation frames do not.
+        if isinstance(event, Frame) and event.opcode in (Opcode.TEXT, Opcode.BINARY):
+            self._text_flags.append(event.opcode is Opcode.TEXT)
+        super().process_event(event)
+
+    async def recv_raw(self):
+        data = await self.recv(decode=False)
+        return data, self._text_flags.popleft()
+
+
+def _frame_header(text, length):
+    """Header of a final, unmasked, uncompressed data frame (RFC 6455, section 5.2)."""
+    first = 0x80 | (Opcode.TEXT if text else Opcode.BINARY)
+    if length < 126:
+        return struct.pack("!BB", first, length)
+    if length < 1 << 16:
+        return struct.pack("!BBH", first, 126, length)
+    return struct.pack("!BBQ", first, 127, length)
+
+
+def broadcast(peers, messages):
+    """Like websockets.broadcast(), but frames a batch of messages once and writes it to every peer.
+
+    `messages` holds (payload, is_text) pairs. Server frames are unmasked and main() disables
+    compression, so the same headers and payloads are valid for every peer; writelines() hands the
+    whole batch to the socket without joining it into a copy.
+    """
+    chunks = None
+    for peer in peers:
+        protocol = peer.protocol
+        if protocol.state is not State.OPEN or peer.send_in_progress is not None:
+            continue
+        if peer.transport.get_write_buffer_size() > MAX_PEER_BACKLOG_BYTES:
+            # Fan-out never waits on a slow peer, so bound what it can pile up; dropping the
+            # connection lets the client reconnect instead of silently losing signaling messages.
+            peer.transport.abort()
+            continue
+        if chunks is None:
+            chunks = []
+            for message, text in messages:
+                chunks.append(_frame_header(text, len(message)))
+                chunks.append(message)
+        try:
+            peer.transport.writelines(chunks)
+        except (OSError, RuntimeError):
+            # A transport that is shutting down may refuse writes; that peer is leaving anyway.
+            pass
+
+
+def _update_membership(websocket, joined):
+    global peer_others
+    if joined:
+        clients.add(websocket)
+    else:
+        clients.discard(websocket)
+    peers = tuple(clients)
+    peer_others = {peer: tuple(other for other in peers if other is not peer) for peer in peers}
 
 
 async def relay(websocket):
-    clients.add(websocket)
+    loop = asyncio.get_running_loop()
+    pending = []
+
+    def flush():
+        if pending:
+            broadcast(peer_others[websocket], pending)
+            pending.clear()
+
+    _update_membership(websocket, joined=True)
     try:
-        async for message in websocket:
-            for client in tuple(clients):
-                if client is websocket:
-                    continue
-                with contextlib.suppress(Exception):
-                    await client.send(message)
+        while True:
+            message, text = await websocket.recv_raw()
+            # Frames that arrived in the same read are received without suspending, so they all
+            # queue up before flush() runs and bursts (e.g. ICE candidates) go out in one write per
+            # peer. Writes never await a peer; peers that are closing or failing are skipped.
+            if not pending:
+                loop.call_soon(flush)
+            pending.append((message, text))
     except (ConnectionClosed, ConnectionResetError, OSError):
         pass
     finally:
-        clients.discard(websocket)
+        flush()
+        _update_membership(websocket, joined=False)
 
 
 async def main():
-    health_thread = threading.Thread(target=start_health_server, daemon=True)
-    health_thread.start()
+    # Probe requests are a few hundred bytes; a small reader limit keeps each health connection's
+    # buffer small and rejects oversized request heads early.
+    health_server = await asyncio.start_server(handle_health, "0.0.0.0", HEALTH_PORT, limit=8192)
+    print(f"Health endpoint listening on http://0.0.0.0:{HEALTH_PORT}/health")
 
-    async with websockets.serve(
+    async with health_server, serve(
         relay,
         "0.0.0.0",
         8765,
         ping_interval=20,
         ping_timeout=20,
         close_timeout=2,
+        # Signaling messages are small JSON; per-message deflate would only cost CPU and zlib state per peer.
+        compression=None,
+        # SDP offers and ICE candidates fit comfortably in 64 KiB; bounding frame size and the
+        # per-connection queues keeps a misbehaving peer from growing the relay's memory.
+        max_size=65536,
+        max_queue=32,
+        write_limit=65536,
+        create_connection=RelayConnection,
     ):
         print("WebSocket relay listening on ws://0.0.0.0:8765")
         await asyncio.Future()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None and hasattr(uvloop, "run"):
+        uvloop.run(main())
+    elif uvloop is not None:
+        # uvloop < 0.18 has no run(); its event loop policy works on every supported Python.
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        asyncio.run(main())
+    else:
+        asyncio.run(main())